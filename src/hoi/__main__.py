@@ -2,6 +2,8 @@
 ##
 ##
 
+from pathlib import Path
+
 from PySide6.QtWidgets import QApplication
 
 from hoi.datasets import H2ODataset
@@ -9,11 +11,11 @@ from hoi.widgets import MainWindow
 
 
 def main() -> None:
-    dataset = H2ODataset("datasets/h2o")
-    samples = list(iter(dataset))
+    path = Path("datasets/h2o")
+    dataset = H2ODataset(path)
 
     app = QApplication([])
-    window = MainWindow(samples)
+    window = MainWindow(dataset, thumbnail_cache=path / ".cache" / "thumbnails")
     window.setMinimumSize(800, 600)
     window.show()
     app.exec()
@@ -2,6 +2,7 @@
 ##
 ##
 
+from pathlib import Path
 from typing import Iterator, Protocol
 
 from hoi.structs import Sample, SampleID
@@ -25,6 +26,11 @@ class Dataset(Protocol):
         """The splits of the dataset."""
         ...
 
+    @property
+    def ids(self) -> list[SampleID]:
+        """The IDs of the samples in the dataset, in iteration order."""
+        ...
+
     def __len__(self) -> int:
         """The number of samples in the dataset."""
         ...
@@ -36,3 +42,7 @@ class Dataset(Protocol):
     def __getitem__(self, id: SampleID) -> Sample:
         """Gets the sample with the given ID."""
         ...
+
+    def image_path(self, id: SampleID) -> Path:
+        """Gets the path to the image of the sample with the given ID."""
+        ...
@@ -2,14 +2,67 @@
 ##
 ##
 
-import json
+import pickle
+import sys
+from dataclasses import dataclass
+from operator import itemgetter
 from pathlib import Path
 from typing import Iterator
 
+import numpy as np
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+    # without orjson, the split files are streamed to limit the peak memory
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+else:
+    # orjson parses a whole split faster than ijson can stream it
+    ijson = None
+
 from hoi.structs import Action, BoundingBox, BoundingBoxFormat, Entity, Sample, SampleID
 
 from ._dataset import Dataset
 
+# the version of the on-disk cache, to be increased whenever its content changes
+_CACHE_VERSION = 1
+
+# accessors for the fields of the samples in the JSON files
+_sample_fields = itemgetter("id", "entities", "actions")
+_entity_fields = itemgetter("bbox", "category")
+_action_fields = itemgetter("verb", "subject", "target", "instrument")
+
+
+@dataclass(frozen=True)
+class _SampleRecord:
+    """The compact representation of a sample from which a Sample is built.
+
+    Attributes
+    ----------
+    split : str
+        The split the sample belongs to.
+    start : int
+        The index of the first bounding box of the sample in the boxes array.
+    stop : int
+        The index after the last bounding box of the sample in the boxes array.
+    categories : list[str]
+        The categories of the entities in the sample.
+    actions : list[tuple[str, int, int | None, int | None]]
+        The (verb, subject, target, instrument) tuples of the actions in the
+        sample.
+    """
+
+    split: str
+    start: int
+    stop: int
+    categories: list[str]
+    actions: list[tuple[str, int, int | None, int | None]]
+
 
 class H2ODataset(Dataset):
     """The Human-to-Human-or-Object Interaction Dataset."""
@@ -30,11 +83,19 @@ class H2ODataset(Dataset):
         self._categories = self._get_categories()
         self._verbs = self._get_verbs()
 
-        self._samples = {
-            id: sample
-            for split in self.splits
-            for id, sample in self._get_samples(split)
-        }
+        # the bounding boxes of all the samples are stored in a single array and
+        # samples are only built the first time they are accessed
+        cache = self._load_cache()
+        if cache is not None:
+            self._boxes, self._records = cache
+        else:
+            # the key is taken before parsing, so that a file modified in the
+            # meantime invalidates the cache
+            sources = self._get_sources_key()
+            self._boxes, self._records = self._get_records()
+            self._save_cache(sources)
+
+        self._samples: dict[SampleID, Sample] = {}
 
     # -------------------------------------------------------------------------
     # Public API
@@ -52,19 +113,37 @@ class H2ODataset(Dataset):
     def splits(self) -> list[str]:
         return ["train", "test"]
 
+    @property
+    def ids(self) -> list[SampleID]:
+        return list(self._records)
+
     def __len__(self) -> int:
-        return len(self._samples)
+        return len(self._records)
 
     def __iter__(self) -> Iterator[tuple[SampleID, Sample]]:
-        return iter(self._samples.items())
+        for id in self._records:
+            yield id, self[id]
 
     def __getitem__(self, id: SampleID) -> Sample:
-        return self._samples[id]
+        sample = self._samples.get(id)
+        if sample is None:
+            sample = self._materialize(id, self._records[id])
+            self._samples[id] = sample
+
+        return sample
+
+    def image_path(self, id: SampleID) -> Path:
+        # the path is derived from the record, so that the sample is not built
+        return self._path / "images" / self._records[id].split / f"{id}.jpg"
 
     # -------------------------------------------------------------------------
     # Private API
     # -------------------------------------------------------------------------
 
+    @property
+    def _cache_path(self) -> Path:
+        return self._path / ".cache"
+
     def _get_categories(self) -> list[str]:
         """Returns the list of categories in the dataset.
 
@@ -74,8 +153,7 @@ class H2ODataset(Dataset):
             The list of categories in the dataset.
         """
 
-        with (self._path / "categories.json").open("r") as f:
-            return json.load(f)
+        return json_loads((self._path / "categories.json").read_bytes())
 
     def _get_verbs(self) -> list[str]:
         """Returns the list of verbs in the dataset.
@@ -86,11 +164,13 @@ class H2ODataset(Dataset):
             The list of verbs in the dataset.
         """
 
-        with (self._path / "verbs.json").open("r") as f:
-            return json.load(f)
+        return json_loads((self._path / "verbs.json").read_bytes())
+
+    def _get_samples(self, split: str) -> Iterator[dict]:
+        """Iterates over the raw samples of the given split.
 
-    def _get_samples(self, split: str) -> list[tuple[SampleID, Sample]]:
-        """Returns the list of samples in the dataset.
+        If orjson is not installed but ijson is, the samples are parsed one at a
+        time, so that the whole split is never held in memory at once.
 
         Parameters
         ----------
@@ -99,43 +179,188 @@ class H2ODataset(Dataset):
 
         Returns
         -------
-        list[tuple[SampleID, Sample]]
-            The list of samples in the dataset.
+        Iterator[dict]
+            The samples of the split as parsed from the JSON file.
         """
 
-        with (self._path / f"{split}.json").open("r") as f:
-            data = json.load(f)
-
-        samples = []
-        for sample_data in data:
-            id = SampleID(sample_data["id"])
-            image = self._path / "images" / f"{split}" / f"{id}.jpg"
-
-            entities = []
-            for entity_data in sample_data["entities"]:
-                entities.append(
-                    Entity(
-                        bbox=BoundingBox(
-                            entity_data["bbox"], BoundingBoxFormat.XYXY, True
-                        ),
-                        category=entity_data["category"],
-                    )
+        path = self._path / f"{split}.json"
+        if ijson is None:
+            yield from json_loads(path.read_bytes())
+        else:
+            with path.open("rb") as f:
+                yield from ijson.items(f, "item", use_float=True)
+
+    def _get_records(self) -> tuple[np.ndarray, dict[SampleID, _SampleRecord]]:
+        """Parses the samples of all the splits into their compact representation.
+
+        Returns
+        -------
+        tuple[np.ndarray, dict[SampleID, _SampleRecord]]
+            The (N, 4) array with the bounding boxes of all the entities in the
+            dataset and the records of the samples.
+        """
+
+        coords = []
+        records = {}
+        for split in self.splits:
+            for sample_data in self._get_samples(split):
+                id, entities_data, actions_data = _sample_fields(sample_data)
+
+                # categories and verbs are repeated across many samples, so they
+                # are interned to share a single string object for each label
+                start = len(coords)
+                categories = []
+                for entity_data in entities_data:
+                    bbox, category = _entity_fields(entity_data)
+                    coords.append(bbox)
+                    categories.append(sys.intern(category))
+
+                actions = []
+                for action_data in actions_data:
+                    verb, subject, target, instrument = _action_fields(action_data)
+                    actions.append((sys.intern(verb), subject, target, instrument))
+
+                records[SampleID(id)] = _SampleRecord(
+                    split=split,
+                    start=start,
+                    stop=len(coords),
+                    categories=categories,
+                    actions=actions,
                 )
 
-            actions = []
-            for action_data in sample_data["actions"]:
-                actions.append(
-                    Action(
-                        verb=action_data["verb"],
-                        subject=action_data["subject"],
-                        target=action_data["target"],
-                        instrument=action_data["instrument"],
-                    )
+        boxes = np.asarray(coords, dtype=np.float64).reshape(-1, 4)
+        return boxes, records
+
+    def _get_sources_key(self) -> dict[str, tuple[int, int]]:
+        """Returns the (mtime in nanoseconds, size) of the file of each split.
+
+        The cache is only used if this key matches the one it was saved with. The
+        values are compared for equality rather than ordering, since extracting
+        or copying a dataset may preserve older modification times.
+        """
+
+        key = {}
+        for split in self.splits:
+            stat = (self._path / f"{split}.json").stat()
+            key[split] = (stat.st_mtime_ns, stat.st_size)
+
+        return key
+
+    def _load_cache(
+        self,
+    ) -> tuple[np.ndarray, dict[SampleID, _SampleRecord]] | None:
+        """Loads the bounding boxes and the sample records from the cache.
+
+        The bounding boxes are memory-mapped, so that they are read from disk only
+        when a sample is accessed.
+
+        Returns
+        -------
+        tuple[np.ndarray, dict[SampleID, _SampleRecord]] | None
+            The bounding boxes and the sample records, or None if the cache does
+            not exist, is corrupted or does not match the dataset files.
+        """
+
+        try:
+            with (self._cache_path / "records.pkl").open("rb") as f:
+                cache = pickle.load(f)
+            boxes = np.load(self._cache_path / "boxes.npy", mmap_mode="r")
+        except (
+            OSError,
+            EOFError,
+            ValueError,
+            AttributeError,
+            ImportError,
+            pickle.UnpicklingError,
+        ):
+            return None
+
+        if (
+            not isinstance(cache, dict)
+            or cache.get("version") != _CACHE_VERSION
+            or cache.get("sources") != self._get_sources_key()
+            or cache.get("num_boxes") != len(boxes)
+        ):
+            return None
+
+        return boxes, cache["records"]
+
+    def _save_cache(self, sources: dict[str, tuple[int, int]]) -> None:
+        """Saves the bounding boxes and the sample records to the cache.
+
+        If the cache cannot be written (e.g. the dataset folder is read-only), the
+        dataset is simply parsed again the next time it is loaded.
+
+        Parameters
+        ----------
+        sources : dict[str, tuple[int, int]]
+            The key of the split files the records were parsed from.
+        """
+
+        try:
+            self._cache_path.mkdir(exist_ok=True)
+
+            # write to temporary files first so that an interrupted write does not
+            # leave a corrupted cache behind
+            tmp_path = self._cache_path / "boxes.npy.tmp"
+            with tmp_path.open("wb") as f:
+                np.save(f, self._boxes)
+            tmp_path.replace(self._cache_path / "boxes.npy")
+
+            cache = {
+                "version": _CACHE_VERSION,
+                "sources": sources,
+                "num_boxes": len(self._boxes),
+                "records": self._records,
+            }
+            tmp_path = self._cache_path / "records.pkl.tmp"
+            with tmp_path.open("wb") as f:
+                pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(self._cache_path / "records.pkl")
+        except OSError:
+            pass
+
+    def _materialize(self, id: SampleID, record: _SampleRecord) -> Sample:
+        """Builds a sample from its compact representation.
+
+        Parameters
+        ----------
+        id : SampleID
+            The ID of the sample.
+        record : _SampleRecord
+            The compact representation of the sample.
+
+        Returns
+        -------
+        Sample
+            The sample.
+        """
+
+        coords = self._boxes[record.start : record.stop].tolist()
+
+        entities = []
+        for bbox, category in zip(coords, record.categories):
+            entities.append(
+                Entity(
+                    bbox=BoundingBox(tuple(bbox), BoundingBoxFormat.XYXY, True),
+                    category=category,
                 )
+            )
 
-            sample = Sample(
-                image_path=image, entities=entities, actions=actions, splits=[split]
+        actions = []
+        for verb, subject, target, instrument in record.actions:
+            actions.append(
+                Action(
+                    verb=verb,
+                    subject=subject,
+                    target=target,
+                    instrument=instrument,
+                )
             )
-            samples.append((id, sample))
 
-        return samples
+        return Sample(
+            image_path=self.image_path(id),
+            entities=entities,
+            actions=actions,
+            splits=[record.split],
+        )
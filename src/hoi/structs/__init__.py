@@ -2,12 +2,13 @@
 ##
 ##
 
-from ._box import BoundingBox, BoundingBoxFormat
+from ._box import BoundingBox, BoundingBoxArray, BoundingBoxFormat
 from ._sample import Action, Entity, Sample, SampleID
 
 __all__ = [
     "Action",
     "BoundingBox",
+    "BoundingBoxArray",
     "BoundingBoxFormat",
     "Entity",
     "Sample",
@@ -4,7 +4,9 @@
 
 import enum
 from dataclasses import dataclass
-from typing import Self, assert_never
+from typing import Callable, Iterable, Self, TypeVar
+
+import numpy as np
 
 
 class BoundingBoxFormat(enum.Enum):
@@ -22,7 +24,61 @@ class BoundingBoxFormat(enum.Enum):
         return self.value
 
 
-@dataclass(frozen=True)
+# -----------------------------------------------------------------------------
+# Conversions
+# -----------------------------------------------------------------------------
+
+# the conversions are applied either to the coordinates of a single bounding box
+# or, element-wise, to the columns of an array of bounding boxes
+_T = TypeVar("_T", float, np.ndarray)
+
+
+def _xyxy_to_xywh(c: tuple[_T, _T, _T, _T]) -> tuple[_T, _T, _T, _T]:
+    xmin, ymin, xmax, ymax = c
+    return xmin, ymin, xmax - xmin, ymax - ymin
+
+
+def _xyxy_to_cxcywh(c: tuple[_T, _T, _T, _T]) -> tuple[_T, _T, _T, _T]:
+    xmin, ymin, xmax, ymax = c
+    return (xmin + xmax) / 2, (ymin + ymax) / 2, xmax - xmin, ymax - ymin
+
+
+def _xywh_to_xyxy(c: tuple[_T, _T, _T, _T]) -> tuple[_T, _T, _T, _T]:
+    xmin, ymin, w, h = c
+    return xmin, ymin, xmin + w, ymin + h
+
+
+def _xywh_to_cxcywh(c: tuple[_T, _T, _T, _T]) -> tuple[_T, _T, _T, _T]:
+    xmin, ymin, w, h = c
+    return xmin + w / 2, ymin + h / 2, w, h
+
+
+def _cxcywh_to_xyxy(c: tuple[_T, _T, _T, _T]) -> tuple[_T, _T, _T, _T]:
+    cx, cy, w, h = c
+    return cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2
+
+
+def _cxcywh_to_xywh(c: tuple[_T, _T, _T, _T]) -> tuple[_T, _T, _T, _T]:
+    cx, cy, w, h = c
+    return cx - w / 2, cy - h / 2, w, h
+
+
+_CONVERT: dict[tuple[BoundingBoxFormat, BoundingBoxFormat], Callable] = {
+    (BoundingBoxFormat.XYXY, BoundingBoxFormat.XYWH): _xyxy_to_xywh,
+    (BoundingBoxFormat.XYXY, BoundingBoxFormat.CXCYWH): _xyxy_to_cxcywh,
+    (BoundingBoxFormat.XYWH, BoundingBoxFormat.XYXY): _xywh_to_xyxy,
+    (BoundingBoxFormat.XYWH, BoundingBoxFormat.CXCYWH): _xywh_to_cxcywh,
+    (BoundingBoxFormat.CXCYWH, BoundingBoxFormat.XYXY): _cxcywh_to_xyxy,
+    (BoundingBoxFormat.CXCYWH, BoundingBoxFormat.XYWH): _cxcywh_to_xywh,
+}
+
+
+# -----------------------------------------------------------------------------
+# BoundingBox
+# -----------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, slots=True)
 class BoundingBox:
     """A bounding box.
 
@@ -115,30 +171,7 @@ class BoundingBox:
             The bounding box in the xyxy format.
         """
 
-        match self.format:
-            case BoundingBoxFormat.XYXY:
-                return self
-            case BoundingBoxFormat.XYWH:
-                xmin, ymin, w, h = self.coordinates
-                return self.__class__(
-                    coordinates=(xmin, ymin, xmin + w, ymin + h),
-                    format=BoundingBoxFormat.XYXY,
-                    normalized=self.normalized,
-                )
-            case BoundingBoxFormat.CXCYWH:
-                cx, cy, w, h = self.coordinates
-                return self.__class__(
-                    coordinates=(
-                        cx - w / 2,
-                        cy - h / 2,
-                        cx + w / 2,
-                        cy + h / 2,
-                    ),
-                    format=BoundingBoxFormat.XYXY,
-                    normalized=self.normalized,
-                )
-            case _ as e:
-                assert_never(e)
+        return self.convert(BoundingBoxFormat.XYXY)
 
     def to_xywh(self) -> Self:
         """Converts the bounding box to the xywh format.
@@ -149,30 +182,7 @@ class BoundingBox:
             The bounding box in the xywh format.
         """
 
-        match self.format:
-            case BoundingBoxFormat.XYWH:
-                return self
-            case BoundingBoxFormat.XYXY:
-                xmin, ymin, xmax, ymax = self.coordinates
-                return self.__class__(
-                    coordinates=(xmin, ymin, xmax - xmin, ymax - ymin),
-                    format=BoundingBoxFormat.XYWH,
-                    normalized=self.normalized,
-                )
-            case BoundingBoxFormat.CXCYWH:
-                cx, cy, w, h = self.coordinates
-                return self.__class__(
-                    coordinates=(
-                        cx - w / 2,
-                        cy - h / 2,
-                        w,
-                        h,
-                    ),
-                    format=BoundingBoxFormat.XYWH,
-                    normalized=self.normalized,
-                )
-            case _ as e:
-                assert_never(e)
+        return self.convert(BoundingBoxFormat.XYWH)
 
     def to_cxcywh(self) -> Self:
         """Converts the bounding box to the cxcywh format.
@@ -183,35 +193,7 @@ class BoundingBox:
             The bounding box in the cxcywh format.
         """
 
-        match self.format:
-            case BoundingBoxFormat.CXCYWH:
-                return self
-            case BoundingBoxFormat.XYXY:
-                xmin, ymin, xmax, ymax = self.coordinates
-                return self.__class__(
-                    coordinates=(
-                        (xmin + xmax) / 2,
-                        (ymin + ymax) / 2,
-                        xmax - xmin,
-                        ymax - ymin,
-                    ),
-                    format=BoundingBoxFormat.CXCYWH,
-                    normalized=self.normalized,
-                )
-            case BoundingBoxFormat.XYWH:
-                xmin, ymin, w, h = self.coordinates
-                return self.__class__(
-                    coordinates=(
-                        xmin + w / 2,
-                        ymin + h / 2,
-                        w,
-                        h,
-                    ),
-                    format=BoundingBoxFormat.CXCYWH,
-                    normalized=self.normalized,
-                )
-            case _ as e:
-                assert_never(e)
+        return self.convert(BoundingBoxFormat.CXCYWH)
 
     def convert(self, format: BoundingBoxFormat) -> Self:
         """Converts the bounding box to the specified format.
@@ -227,12 +209,193 @@ class BoundingBox:
             The bounding box in the specified format.
         """
 
-        match format:
-            case BoundingBoxFormat.XYXY:
-                return self.to_xyxy()
-            case BoundingBoxFormat.XYWH:
-                return self.to_xywh()
-            case BoundingBoxFormat.CXCYWH:
-                return self.to_cxcywh()
-            case _ as e:
-                assert_never(e)
+        if format == self.format:
+            return self
+
+        return self.__class__(
+            coordinates=_CONVERT[(self.format, format)](self.coordinates),
+            format=format,
+            normalized=self.normalized,
+        )
+
+
+# -----------------------------------------------------------------------------
+# BoundingBoxArray
+# -----------------------------------------------------------------------------
+
+
+@dataclass(frozen=True, eq=False, slots=True)
+class BoundingBoxArray:
+    """A collection of bounding boxes stored in a single array.
+
+    All the bounding boxes share the same format and normalization, so that
+    conversions can be applied to all of them at once.
+
+    Attributes
+    ----------
+    coordinates : np.ndarray
+        The coordinates of the bounding boxes as an array of shape (N, 4). The
+        coordinates are in the format specified by `format`.
+    format : BoundingBoxFormat
+        The format of the coordinates.
+    normalized : bool
+        Whether the coordinates are normalized. If True, the coordinates are
+        normalized to the range [0, 1]. Otherwise, the coordinates are in pixels.
+    """
+
+    coordinates: np.ndarray
+    format: BoundingBoxFormat
+    normalized: bool
+
+    def __post_init__(self) -> None:
+        if self.coordinates.ndim != 2 or self.coordinates.shape[1] != 4:
+            raise ValueError(
+                f"Expected an array of shape (N, 4), got {self.coordinates.shape}."
+            )
+
+    @classmethod
+    def from_boxes(cls, boxes: Iterable[BoundingBox], size: tuple[int, int]) -> Self:
+        """Stacks the given bounding boxes into a single array.
+
+        The bounding boxes are converted to the xyxy format and normalized, so
+        that boxes with different formats and normalizations can be stacked.
+
+        Parameters
+        ----------
+        boxes : Iterable[BoundingBox]
+            The bounding boxes to stack.
+        size : tuple[int, int]
+            The size of the image that the bounding boxes are in. The size should
+            be in the format (width, height).
+
+        Returns
+        -------
+        BoundingBoxArray
+            The normalized bounding boxes in the xyxy format.
+        """
+
+        coords = [box.to_xyxy().normalize(size).coordinates for box in boxes]
+        return cls(
+            coordinates=np.asarray(coords, dtype=np.float64).reshape(-1, 4),
+            format=BoundingBoxFormat.XYXY,
+            normalized=True,
+        )
+
+    def __len__(self) -> int:
+        return len(self.coordinates)
+
+    def __getitem__(self, idx: int) -> BoundingBox:
+        return BoundingBox(
+            coordinates=tuple(self.coordinates[idx].tolist()),  # type: ignore
+            format=self.format,
+            normalized=self.normalized,
+        )
+
+    def normalize(self, size: tuple[int, int]) -> Self:
+        """Normalizes the bounding boxes coordinates to the range [0, 1].
+
+        Parameters
+        ----------
+        size : tuple[int, int]
+            The size of the image that the bounding boxes are in. The size should
+            be in the format (width, height).
+
+        Returns
+        -------
+        BoundingBoxArray
+            The bounding boxes with normalized coordinates.
+        """
+
+        if self.normalized:
+            return self
+
+        w, h = size
+        scale = np.array([w, h, w, h], dtype=self.coordinates.dtype)
+        return self.__class__(
+            coordinates=self.coordinates / scale,
+            format=self.format,
+            normalized=True,
+        )
+
+    def denormalize(self, size: tuple[int, int]) -> Self:
+        """Denormalizes the bounding boxes coordinates to the pixel range.
+
+        Parameters
+        ----------
+        size : tuple[int, int]
+            The size of the image that the bounding boxes are in. The size should
+            be in the format (width, height).
+
+        Returns
+        -------
+        BoundingBoxArray
+            The bounding boxes with denormalized coordinates.
+        """
+
+        if not self.normalized:
+            return self
+
+        w, h = size
+        scale = np.array([w, h, w, h], dtype=self.coordinates.dtype)
+        return self.__class__(
+            coordinates=self.coordinates * scale,
+            format=self.format,
+            normalized=False,
+        )
+
+    def to_xyxy(self) -> Self:
+        """Converts the bounding boxes to the xyxy format.
+
+        Returns
+        -------
+        BoundingBoxArray
+            The bounding boxes in the xyxy format.
+        """
+
+        return self.convert(BoundingBoxFormat.XYXY)
+
+    def to_xywh(self) -> Self:
+        """Converts the bounding boxes to the xywh format.
+
+        Returns
+        -------
+        BoundingBoxArray
+            The bounding boxes in the xywh format.
+        """
+
+        return self.convert(BoundingBoxFormat.XYWH)
+
+    def to_cxcywh(self) -> Self:
+        """Converts the bounding boxes to the cxcywh format.
+
+        Returns
+        -------
+        BoundingBoxArray
+            The bounding boxes in the cxcywh format.
+        """
+
+        return self.convert(BoundingBoxFormat.CXCYWH)
+
+    def convert(self, format: BoundingBoxFormat) -> Self:
+        """Converts the bounding boxes to the specified format.
+
+        Parameters
+        ----------
+        format : BoundingBoxFormat
+            The format to convert the bounding boxes to.
+
+        Returns
+        -------
+        BoundingBoxArray
+            The bounding boxes in the specified format.
+        """
+
+        if format == self.format:
+            return self
+
+        columns = _CONVERT[(self.format, format)](tuple(self.coordinates.T))
+        return self.__class__(
+            coordinates=np.stack(columns, axis=1),
+            format=format,
+            normalized=self.normalized,
+        )
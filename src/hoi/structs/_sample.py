@@ -17,7 +17,7 @@ from ._box import BoundingBox
 SampleID = NewType("SampleID", str)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Sample:
     """A sample in the dataset.
 
@@ -44,7 +44,7 @@ class Sample:
 # -----------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Entity:
     """An entity in an image.
 
@@ -67,7 +67,7 @@ class Entity:
 # -----------------------------------------------------------------------------
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Action:
     """An action in an image.
 
@@ -2,17 +2,26 @@
 ##
 ##
 
-import math
-from typing import Any
-
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
 from PIL import Image
-from PIL.ImageQt import ImageQt
 from PySide6.QtCore import (
     QAbstractTableModel,
     QModelIndex,
+    QObject,
     QPersistentModelIndex,
+    QRunnable,
     QSize,
     Qt,
+    QThreadPool,
     Signal,
     Slot,
 )
@@ -33,7 +42,208 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from hoi.structs import Action, Entity, Sample, SampleID
+from hoi.datasets import Dataset
+from hoi.structs import Action, BoundingBoxArray, Entity, Sample, SampleID
+
+THUMBNAIL_SIZE = 300
+
+# the errors raised by Pillow when an image is missing, corrupted or too large
+_DECODE_ERRORS = (OSError, ValueError, Image.DecompressionBombError)
+
+
+def _load_thumbnail(path: Path) -> Image.Image:
+    """Loads an image and resizes it to fit in a THUMBNAIL_SIZE square."""
+
+    image = Image.open(path)
+    # let the JPEG decoder downscale the image while decoding it
+    image.draft("RGB", (THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+    image.thumbnail((THUMBNAIL_SIZE, THUMBNAIL_SIZE), Image.Resampling.BILINEAR)
+    return image.convert("RGB")
+
+
+def _decode_thumbnail(path: Path) -> np.ndarray | None:
+    """Returns the thumbnail of an image as an array of shape (H, W, 3).
+
+    If the image cannot be loaded, None is returned instead of raising, so that a
+    single unreadable image does not abort the generation of all the others.
+    """
+
+    try:
+        return np.asarray(_load_thumbnail(path))
+    except _DECODE_ERRORS:
+        return None
+
+
+@lru_cache(maxsize=64)
+def _pen_table(categories: frozenset[str]) -> dict[str, QPen]:
+    """Returns the pens used to draw the entities of the given categories.
+
+    Each category is assigned a different hue. Since scenes showing entities of
+    the same categories share the same pens, the pens are created only once.
+    """
+
+    return {
+        category: QPen(
+            QColor.fromHsv(int(360 / len(categories) * idx), 255, 255),
+            2,
+            Qt.PenStyle.SolidLine,
+            Qt.PenCapStyle.RoundCap,
+        )
+        for idx, category in enumerate(sorted(categories))
+    }
+
+
+@contextmanager
+def _batch_updates(table: QTableWidget) -> Iterator[None]:
+    """Disables the updates and the signals of a table while it is being filled."""
+
+    table.setUpdatesEnabled(False)
+    table.blockSignals(True)
+    try:
+        yield
+    finally:
+        table.blockSignals(False)
+        table.setUpdatesEnabled(True)
+        table.viewport().update()
+
+
+class ThumbnailCache:
+    """On-disk cache of the thumbnails of a list of images.
+
+    The thumbnails are stored in a single array of shape (N, THUMBNAIL_SIZE,
+    THUMBNAIL_SIZE, 3), where each thumbnail is placed in the top left corner of
+    its slot, together with an array of shape (N, 2) containing the (width,
+    height) of each thumbnail. Both arrays are memory-mapped, so that only the
+    thumbnails that are displayed are read from disk. A key computed from the
+    path, modification time and size of the images, in order, is saved with the
+    arrays, so that the cache is rebuilt whenever the images change.
+    """
+
+    def __init__(self, path: Path | str, image_paths: list[Path]) -> None:
+        """Initializes a new ThumbnailCache instance.
+
+        If the cache does not exist or it was created for different images, the thumbnails are generated and saved to disk.
+
+        Parameters
+        ----------
+        path : Path | str
+            The path to the folder where the cache is stored.
+        image_paths : list[Path]
+            The paths to the images whose thumbnails are cached.
+        """
+
+        path = Path(path)
+        thumbnails_path = path / "thumbnails.npy"
+        sizes_path = path / "thumbnail_sizes.npy"
+        key_path = path / "thumbnails.key"
+
+        key = self._get_key(image_paths)
+        if not self._is_valid(thumbnails_path, sizes_path, key_path, key):
+            path.mkdir(parents=True, exist_ok=True)
+            # the key is removed first and written last, so that an interrupted
+            # build is never mistaken for a valid cache
+            key_path.unlink(missing_ok=True)
+            self._build(thumbnails_path, sizes_path, image_paths)
+            key_path.write_text(key)
+
+        self._thumbnails = np.load(thumbnails_path, mmap_mode="r")
+        self._sizes = np.load(sizes_path, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self._thumbnails)
+
+    def pixmap(self, idx: int) -> QPixmap | None:
+        """Returns the thumbnail of the sample at the given index.
+
+        None is returned if the image of the sample could not be loaded when the
+        cache was built.
+        """
+
+        w, h = self._sizes[idx].tolist()
+        if w == 0 or h == 0:
+            return None
+
+        # the image refers to the memory-mapped buffer, the pixmap copies it
+        image = QImage(
+            self._thumbnails[idx].data,
+            w,
+            h,
+            THUMBNAIL_SIZE * 3,
+            QImage.Format.Format_RGB888,
+        )
+        return QPixmap.fromImage(image)
+
+    @staticmethod
+    def _get_key(image_paths: list[Path]) -> str:
+        """Returns a hash of the thumbnail size and the given images."""
+
+        key = sha256(f"{THUMBNAIL_SIZE}\n".encode())
+        for path in image_paths:
+            path = path.resolve()
+            try:
+                stat = path.stat()
+            except OSError:
+                # a missing image is part of the key as well, so that the cache is
+                # rebuilt once it becomes available
+                key.update(f"{path}\0missing\n".encode())
+            else:
+                key.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+
+        return key.hexdigest()
+
+    @staticmethod
+    def _is_valid(
+        thumbnails_path: Path, sizes_path: Path, key_path: Path, key: str
+    ) -> bool:
+        if not thumbnails_path.exists() or not sizes_path.exists():
+            return False
+
+        try:
+            return key_path.read_text() == key
+        except OSError:
+            return False
+
+    @staticmethod
+    def _build(
+        thumbnails_path: Path,
+        sizes_path: Path,
+        image_paths: list[Path],
+    ) -> None:
+        # the thumbnails are written to a temporary file first so that an
+        # interrupted build does not leave an incomplete cache behind
+        tmp_path = thumbnails_path.with_suffix(".tmp")
+        try:
+            thumbnails = np.lib.format.open_memmap(
+                tmp_path,
+                mode="w+",
+                dtype=np.uint8,
+                shape=(len(image_paths), THUMBNAIL_SIZE, THUMBNAIL_SIZE, 3),
+            )
+            # images that cannot be loaded are left with a size of (0, 0)
+            sizes = np.zeros((len(image_paths), 2), dtype=np.int32)
+
+            # decoding and resizing the images is CPU-bound, so it is spread over
+            # multiple processes. These are spawned rather than forked, since Qt
+            # may already be running threads in this process.
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(mp_context=context) as executor:
+                for idx, thumbnail in enumerate(
+                    executor.map(_decode_thumbnail, image_paths, chunksize=32)
+                ):
+                    if thumbnail is None:
+                        continue
+                    h, w, _ = thumbnail.shape
+                    thumbnails[idx, :h, :w] = thumbnail
+                    sizes[idx] = w, h
+
+            thumbnails.flush()
+            del thumbnails
+
+            np.save(sizes_path, sizes)
+            tmp_path.replace(thumbnails_path)
+        finally:
+            # after a successful build the file has already been moved
+            tmp_path.unlink(missing_ok=True)
 
 
 class HOIScene(QGraphicsScene):
@@ -45,6 +255,9 @@ class HOIScene(QGraphicsScene):
 
     def __init__(self, sample: Sample, parent: QWidget | None = None):
         super().__init__(parent=parent)
+        # the items are added once and never moved, so there is no need to keep
+        # them in a spatial index
+        self.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
 
         image = QImage(sample.image_path)
         self.setSceneRect(0, 0, image.width(), image.height())
@@ -65,26 +278,21 @@ class HOIScene(QGraphicsScene):
             The entities to add to the scene.
         """
 
-        categories = set(entity.category for entity in entities)
-        pens = {
-            category: QPen(
-                QColor.fromHsv(int(360 / len(categories) * idx), 255, 255),
-                2,
-                Qt.PenStyle.SolidLine,
-                Qt.PenCapStyle.RoundCap,
-            )
-            for idx, category in enumerate(categories)
-        }
+        pens = _pen_table(frozenset(entity.category for entity in entities))
+
+        # convert all the bounding boxes to denormalized xywh coordinates at once
+        size = (int(self.width()), int(self.height()))
+        bboxes = BoundingBoxArray.from_boxes((entity.bbox for entity in entities), size)
+        coords = bboxes.denormalize(size).to_xywh().coordinates.tolist()
+        font = self.font()
 
-        for idx, entity in enumerate(entities):
+        for idx, (entity, (x, y, w, h)) in enumerate(zip(entities, coords)):
             pen = pens[entity.category]
             # draw the bounding box
-            bbox = entity.bbox.denormalize((self.width(), self.height())).to_xywh()
-            x, y, w, h = bbox.coordinates
             self.addRect(x, y, w, h, pen=pen)
 
             # draw the index of the entity on the top left corner of the bounding box
-            text = self.addText(str(idx))
+            text = self.addText(str(idx), font)
             text.setPos(x, y)
             text.setDefaultTextColor(Qt.GlobalColor.black)
             text.setZValue(1)
@@ -132,9 +340,10 @@ class HOIWidget(QWidget):
         table.setHorizontalHeaderLabels(["Index", "Category"])
         table.setRowCount(len(entities))
 
-        for idx, entity in enumerate(entities):
-            table.setItem(idx, 0, QTableWidgetItem(str(idx)))
-            table.setItem(idx, 1, QTableWidgetItem(entity.category))
+        with _batch_updates(table):
+            for idx, entity in enumerate(entities):
+                table.setItem(idx, 0, QTableWidgetItem(str(idx)))
+                table.setItem(idx, 1, QTableWidgetItem(entity.category))
 
         return table
 
@@ -144,17 +353,14 @@ class HOIWidget(QWidget):
         table.setHorizontalHeaderLabels(["Subject", "Verb", "Target", "Instrument"])
         table.setRowCount(len(actions))
 
-        for idx, action in enumerate(actions):
-            table.setItem(idx, 0, QTableWidgetItem(str(action.subject)))
-            table.setItem(idx, 1, QTableWidgetItem(action.verb))
-            table.setItem(
-                idx, 2, QTableWidgetItem(str(action.target) if action.target else "")
-            )
-            table.setItem(
-                idx,
-                3,
-                QTableWidgetItem(str(action.instrument) if action.instrument else ""),
-            )
+        with _batch_updates(table):
+            for idx, action in enumerate(actions):
+                target = str(action.target) if action.target else ""
+                instrument = str(action.instrument) if action.instrument else ""
+                table.setItem(idx, 0, QTableWidgetItem(str(action.subject)))
+                table.setItem(idx, 1, QTableWidgetItem(action.verb))
+                table.setItem(idx, 2, QTableWidgetItem(target))
+                table.setItem(idx, 3, QTableWidgetItem(instrument))
 
         return table
 
@@ -197,15 +403,48 @@ class MainWindow(QMainWindow):
     sample and a table with the entities and actions in the sample.
     """
 
-    def __init__(self, samples: list[tuple[SampleID, Sample]]) -> None:
+    # the maximum number of overlays kept alive for quick navigation
+    MAX_CACHED_SLIDERS = 8
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        thumbnail_cache: Path | str | None = None,
+    ) -> None:
+        """Initializes a new MainWindow instance.
+
+        Parameters
+        ----------
+        dataset : Dataset
+            The dataset whose samples are displayed. Samples are only loaded from
+            the dataset when their overlay is opened.
+        thumbnail_cache : Path | str | None, optional
+            The folder where the thumbnails of the samples are cached. If given,
+            the cache is built before the window is created (which may take a
+            while the first time) and all the thumbnails are read from it. If
+            None, the thumbnails are instead loaded in the background as they
+            are displayed, which is only meant as a fallback when the thumbnails
+            cannot be cached on disk.
+        """
+
         super().__init__()
 
-        self.samples = samples
+        self.dataset = dataset
+        self.thumbnails = (
+            ThumbnailCache(
+                thumbnail_cache, [dataset.image_path(id) for id in dataset.ids]
+            )
+            if thumbnail_cache is not None
+            else None
+        )
 
         self.setWindowTitle("HOI Dataset Viewer")
 
+        self.model = SampleTableModel(self.dataset, self.thumbnails)
         self.table = self._create_table()
 
+        self._slider_cache: OrderedDict[SampleID, HOISlider] = OrderedDict()
+
         self.stack = QStackedWidget()
         self.stack.addWidget(self.table)
         self.setCentralWidget(self.stack)
@@ -225,8 +464,7 @@ class MainWindow(QMainWindow):
         table.setShowGrid(False)
         table.doubleClicked.connect(self.on_doubleClicked)
 
-        model = SampleTableModel(self.samples)
-        table.setModel(model)
+        table.setModel(self.model)
 
         return table
 
@@ -235,14 +473,29 @@ class MainWindow(QMainWindow):
         if not index.isValid():
             return
 
-        if index.row() * 5 + index.column() >= len(self.samples):
+        sample_id = self.model.sample_id(index)
+        if sample_id is None:
             return
 
         if self.stack.count() == 2:
             self.stack.removeWidget(self.stack.widget(1))
 
-        _, sample = self.samples[index.row() * 5 + index.column()]
+        # the most recently displayed overlays are kept alive, so that navigating
+        # back and forth does not reload the images and rebuild the widgets
+        overlay = self._slider_cache.get(sample_id)
+        if overlay is None:
+            overlay = self._create_slider(index, self.dataset[sample_id])
+            self._slider_cache[sample_id] = overlay
+            if len(self._slider_cache) > self.MAX_CACHED_SLIDERS:
+                _, evicted = self._slider_cache.popitem(last=False)
+                evicted.deleteLater()
+        else:
+            self._slider_cache.move_to_end(sample_id)
+
+        self.stack.insertWidget(1, overlay)
+        self.stack.setCurrentIndex(1)
 
+    def _create_slider(self, index: QModelIndex, sample: Sample) -> HOISlider:
         overlay = HOISlider(sample)
         overlay.close.connect(lambda: self.stack.removeWidget(overlay))
         overlay.left.connect(
@@ -258,8 +511,7 @@ class MainWindow(QMainWindow):
             lambda: self.on_doubleClicked(index.siblingAtRow(index.row() + 1))
         )
 
-        self.stack.insertWidget(1, overlay)
-        self.stack.setCurrentIndex(1)
+        return overlay
 
     def keyReleaseEvent(self, event: QKeyEvent) -> None:
         indexes = self.table.selectedIndexes()
@@ -273,29 +525,89 @@ class MainWindow(QMainWindow):
             super().keyPressEvent(event)
 
 
+class _ThumbnailSignals(QObject):
+    loaded = Signal(int, QImage, name="loaded")
+
+
+class _ThumbnailTask(QRunnable):
+    """Task that loads the thumbnail of a sample outside of the GUI thread.
+
+    QRunnable is not a QObject, so the loaded image is reported through the
+    signal of a separate object living in the GUI thread.
+    """
+
+    def __init__(self, idx: int, path: Path, signals: _ThumbnailSignals) -> None:
+        super().__init__()
+
+        self._idx = idx
+        self._path = path
+        self._signals = signals
+
+    def run(self) -> None:
+        try:
+            thumbnail = _load_thumbnail(self._path)
+        except _DECODE_ERRORS:
+            # a null image tells the model that the thumbnail could not be loaded
+            self._signals.loaded.emit(self._idx, QImage())
+            return
+
+        # the image refers to the bytes of the thumbnail, the copy owns its pixels
+        image = QImage(
+            thumbnail.tobytes("raw", "RGB"),
+            thumbnail.width,
+            thumbnail.height,
+            thumbnail.width * 3,
+            QImage.Format.Format_RGB888,
+        ).copy()
+        self._signals.loaded.emit(self._idx, image)
+
+
 class SampleTableModel(QAbstractTableModel):
-    def __init__(self, samples: list[tuple[SampleID, Sample]]) -> None:
+    # the maximum number of thumbnails kept in memory
+    MAX_CACHED_PIXMAPS = 128
+
+    def __init__(
+        self,
+        dataset: Dataset,
+        thumbnails: ThumbnailCache | None = None,
+    ) -> None:
         super().__init__()
 
-        self.samples = samples
+        self.dataset = dataset
+        self.thumbnails = thumbnails
+
+        # the IDs of the samples arranged as they are displayed, with the last row
+        # padded with None
+        self._ids = dataset.ids
+        padded = [*self._ids, *[None] * (-len(self._ids) % 5)]
+        self._grid = [padded[i : i + 5] for i in range(0, len(padded), 5)]
+
+        self._pixmap_cache: OrderedDict[int, QPixmap] = OrderedDict()
+        self.modelReset.connect(self.clear_cache)
+
+        # when the thumbnails are not cached on disk, they are loaded in the
+        # background and a placeholder is displayed in the meantime. Thumbnails
+        # that could not be loaded are displayed as the error pixmap.
+        self._pending: set[int] = set()
+        self._placeholder = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        self._placeholder.fill(Qt.GlobalColor.lightGray)
+        self._error_pixmap = QPixmap(THUMBNAIL_SIZE, THUMBNAIL_SIZE)
+        self._error_pixmap.fill(Qt.GlobalColor.darkRed)
+        self._signals = _ThumbnailSignals()
+        self._signals.loaded.connect(self._on_thumbnail_loaded)
 
     def rowCount(self, parent: QModelIndex | QPersistentModelIndex = ...) -> int:
-        return 0 if parent.isValid() else math.ceil(len(self.samples) / 5)
+        return 0 if parent.isValid() else len(self._grid)
 
     def columnCount(self, parent: QModelIndex | QPersistentModelIndex = ...) -> int:
         return 0 if parent.isValid() else 5
 
     def data(self, index: QModelIndex | QPersistentModelIndex, role: int = ...) -> Any:
-        if not index.isValid():
-            return None
-        if index.row() * 5 + index.column() >= len(self.samples):
+        if self.sample_id(index) is None:
             return None
 
         if role == Qt.ItemDataRole.DecorationRole:
-            sample = self.samples[index.row() * 5 + index.column()][1]
-            image = Image.open(sample.image_path).convert("RGB")
-            image.thumbnail((300, 300))
-            return QPixmap.fromImage(ImageQt(image))
+            return self._pixmap(index.row() * 5 + index.column())
         elif role == Qt.ItemDataRole.TextAlignmentRole:
             return Qt.AlignmentFlag.AlignCenter
 
@@ -304,6 +616,67 @@ class SampleTableModel(QAbstractTableModel):
     def flags(self, index: QModelIndex | QPersistentModelIndex) -> Qt.ItemFlags:
         return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
 
+    def sample_id(self, index: QModelIndex | QPersistentModelIndex) -> SampleID | None:
+        """Returns the ID of the sample displayed at the given index, if any."""
+
+        if not index.isValid():
+            return None
+
+        return self._grid[index.row()][index.column()]
+
+    @Slot()
+    def clear_cache(self) -> None:
+        """Removes all the thumbnails kept in memory."""
+
+        self._pixmap_cache.clear()
+        self._pending.clear()
+
+    @Slot(int, QImage)
+    def _on_thumbnail_loaded(self, idx: int, image: QImage) -> None:
+        self._pending.discard(idx)
+        # thumbnails that failed to load are marked as such until the cache is
+        # cleared, rather than being retried on every repaint
+        if image.isNull():
+            self._cache_pixmap(idx, self._error_pixmap)
+        else:
+            self._cache_pixmap(idx, QPixmap.fromImage(image))
+
+        index = self.index(idx // 5, idx % 5)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def _pixmap(self, idx: int) -> QPixmap:
+        """Returns the thumbnail of the sample at the given index.
+
+        The most recently used thumbnails are kept in memory, so that they do not
+        need to be loaded again when the view is repainted. If the thumbnail is
+        neither in memory nor cached on disk, it is loaded in the background and
+        a placeholder is returned until it is available.
+        """
+
+        pixmap = self._pixmap_cache.get(idx)
+        if pixmap is not None:
+            self._pixmap_cache.move_to_end(idx)
+            return pixmap
+
+        if self.thumbnails is not None:
+            pixmap = self.thumbnails.pixmap(idx)
+            if pixmap is None:
+                pixmap = self._error_pixmap
+            self._cache_pixmap(idx, pixmap)
+            return pixmap
+
+        if idx not in self._pending:
+            self._pending.add(idx)
+            path = self.dataset.image_path(self._ids[idx])
+            QThreadPool.globalInstance().start(_ThumbnailTask(idx, path, self._signals))
+
+        return self._placeholder
+
+    def _cache_pixmap(self, idx: int, pixmap: QPixmap) -> None:
+        self._pixmap_cache[idx] = pixmap
+        if len(self._pixmap_cache) > self.MAX_CACHED_PIXMAPS:
+            self._pixmap_cache.popitem(last=False)
+
 
 class ThumbnailDelegate(QStyledItemDelegate):
     def paint(